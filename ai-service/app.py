@@ -1,36 +1,201 @@
 import os
+
+if os.environ.get("AI_XLA_JIT", "true").lower() == "true":
+    os.environ.setdefault("TF_XLA_FLAGS", "--tf_xla_auto_jit=2 --tf_xla_cpu_global_jit")
+
+def cgroup_cpu_quota():
+    """CPU limit from the container's CFS quota (cgroup v2, then v1), rounded up; None when unlimited or unknown"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            quota, period = handle.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as handle:
+                quota = handle.read().strip()
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as handle:
+                period = handle.read().strip()
+        except OSError:
+            return None
+
+    try:
+        quota, period = int(quota), int(period)
+    except ValueError:
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return max(1, -(-quota // period))
+
+# sched_getaffinity sees every host CPU inside a container; a docker `cpus:` limit only shows up as a CFS quota
+available_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+available_cpus = min(available_cpus, cgroup_cpu_quota() or available_cpus)
+batching_enabled = int(os.environ.get("AI_MAX_BATCH", 32)) > 1
+intra_op_threads = int(os.environ.get("AI_INTRA_OP_THREADS", min(4, available_cpus) if batching_enabled else 1))
+inter_op_threads = int(os.environ.get("AI_INTER_OP_THREADS", 1))
+
+os.environ.setdefault("OMP_NUM_THREADS", str(intra_op_threads))
+os.environ.setdefault("TF_NUM_INTRAOP_THREADS", str(intra_op_threads))
+os.environ.setdefault("TF_NUM_INTEROP_THREADS", str(inter_op_threads))
+os.environ.setdefault("KMP_BLOCKTIME", "0")
+os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact,1,0")
+
+import atexit
 import logging
 import pickle
 import time
+import hmac
+import hashlib
+import queue
+import threading
 import numpy as np
 import re
-
-
-os.environ['PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION'] = 'python'
-
-from flask import Flask, request, jsonify
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from tensorflow.keras.models import load_model, Sequential
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.layers import Dense, Embedding, LSTM, SpatialDropout1D
-
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+
+log_queue = queue.Queue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] - %(message)s"))
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+log_listener = QueueListener(log_queue, log_handler)
 
 logging.basicConfig(
-    level=os.environ.get("LOG_LEVEL", "INFO"),
-    format="%(asctime)s [%(levelname)s] - %(message)s",
+    level=os.environ.get("LOG_LEVEL", "WARNING" if os.environ.get("FLASK_ENV") == "production" else "INFO"),
+    handlers=[queue_handler],
 )
 logger = logging.getLogger(__name__)
 
+def restart_log_listener():
+    """Give forked workers their own log queue and listener thread (threads do not survive fork)"""
+    queue_handler.queue = log_listener.queue = queue.Queue()
+    log_listener.start()
+
+log_listener.start()
+atexit.register(log_listener.stop)
+os.register_at_fork(after_in_child=restart_log_listener)
+
+tf = None
+
+def import_tensorflow():
+    """Import and configure TensorFlow the first time a model needs it, so keyword-only mode never loads it"""
+    global tf
+
+    if tf is None:
+        import tensorflow
+        from google.protobuf.internal import api_implementation
+
+        if api_implementation.Type() != "cpp":
+            logger.warning(f"protobuf is using the {api_implementation.Type()} implementation; model loading will be slow")
+
+        tensorflow.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+        tensorflow.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        if os.environ.get("AI_BACKEND", "auto") != "tensorrt":
+            tensorflow.config.set_visible_devices([], "GPU")
+        tf = tensorflow
+
+    return tf
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for request parsing and response encoding"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY), mimetype="application/json")
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 CORS(app, resources={r"/*": {"origins": os.environ.get("CORS_ORIGIN", "http://localhost:3000")}})
 
 
 thread_model = None
+predict_fn = None
 tokenizer = None
-max_sequence_length = 100
+encode_text = None
+max_sequence_length = int(os.environ.get("MAX_SEQ_LEN", 100))
+dynamic_padding = False
 using_fresh_model = False
+models_ok = False
+models_ready = threading.Event()
+model_loader = None
+model_loader_lock = threading.Lock()
+health_status = {"status": "loading", "models_loaded": False, "using_fresh_model": False}
+health_etag = hashlib.md5(orjson.dumps(health_status)).hexdigest()
+model_backend = os.environ.get("AI_BACKEND", "auto")
+allow_fresh = os.environ.get("AI_ALLOW_FRESH", "1") == "1"
+xla_jit = os.environ.get("AI_XLA_JIT", "true").lower() == "true"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.environ.get("MODEL_PATH", os.path.join(BASE_DIR, "models", "thread_category_model.h5"))
+TRT_MODEL_PATH = os.environ.get("TRT_MODEL_PATH", os.path.join(BASE_DIR, "models", "thread_category_model_trt"))
+SAVED_MODEL_PATH = os.environ.get("SAVED_MODEL_PATH", os.path.join(BASE_DIR, "models", "thread_category_model"))
+ONNX_MODEL_PATH = os.environ.get("ONNX_MODEL_PATH", os.path.join(BASE_DIR, "models", "thread_category_model.onnx"))
+TFLITE_MODEL_PATH = os.environ.get("TFLITE_MODEL_PATH", os.path.join(BASE_DIR, "models", "thread_category_model.tflite"))
+TFLITE_INT8_MODEL_PATH = os.environ.get("TFLITE_INT8_MODEL_PATH", os.path.join(BASE_DIR, "models", "thread_category_model_int8.tflite"))
+VOCAB_PATH = os.environ.get("VOCAB_PATH", os.path.join(BASE_DIR, "models", "vocab.json"))
+TOKENIZER_PATH = os.environ.get("TOKENIZER_PATH", os.path.join(BASE_DIR, "models", "tokenizer.pickle"))
+
+MAX_BATCH = int(os.environ.get("AI_MAX_BATCH", 32))
+MAX_LATENCY_MS = float(os.environ.get("AI_MAX_LATENCY_MS", 5))
+TOKENIZE_CACHE_SIZE = int(os.environ.get("AI_TOKENIZE_CACHE_SIZE", 4096))
+PREDICTION_CACHE_SIZE = int(os.environ.get("AI_PREDICTION_CACHE_SIZE", 4096))
+WARM_UP_ROUNDS = 3
+
+def padding_buckets(limit, smallest):
+    """Powers of two from smallest up to limit, plus limit itself"""
+    buckets = {limit}
+    size = smallest
+    while size < limit:
+        buckets.add(size)
+        size *= 2
+    return tuple(sorted(buckets))
+
+def bucket_for(size, buckets):
+    """Smallest bucket holding size, capped at the largest bucket"""
+    return buckets[min(bisect_left(buckets, size), len(buckets) - 1)]
+
+# Batches are padded to a fixed set of shapes so XLA and TFLite only ever see shapes warmed up at load time
+BATCH_BUCKETS = padding_buckets(MAX_BATCH, 1)
+LENGTH_BUCKETS = padding_buckets(max_sequence_length, 16)
+
+keyword_fast_path_mode = os.environ.get("AI_KEYWORD_FAST_PATH", "dominant")
+FAST_PATH_MIN_HITS = 2
+FAST_PATH_MIN_MARGIN = 2
+FAST_PATH_CONFIDENCE = 0.99
+FAST_PATH_MIN_KEYWORD_CONFIDENCE = 0.6
+FAST_PATH_SHORT_WORDS = 4
+FAST_PATH_LOG_INTERVAL = 1000
+fast_path_stats = {"dominant": 0, "confident": 0, "short": 0, "model": 0, "requests": 0}
+fast_path_stats_lock = threading.Lock()
+
+batch_queue = queue.Queue()
+batch_worker = None
+batch_worker_lock = threading.Lock()
+
+prediction_cache = OrderedDict()
+prediction_cache_lock = threading.Lock()
 
 
 categories = {
@@ -47,12 +212,21 @@ categories = {
     "other": "Other"
 }
 
+CATEGORIES_JSON = orjson.dumps({
+    "success": True,
+    "categories": [
+        {"id": category_id, "name": name}
+        for category_id, name in categories.items()
+    ]
+})
+CATEGORIES_ETAG = hashlib.md5(CATEGORIES_JSON).hexdigest()
 
-label_mapping = {
-    0: "technology", 1: "health", 2: "education", 3: "entertainment",
-    4: "science", 5: "sports", 6: "politics", 7: "business",
-    8: "lifestyle", 9: "travel", 10: "other"
-}
+
+LABELS = (
+    "technology", "health", "education", "entertainment",
+    "science", "sports", "politics", "business",
+    "lifestyle", "travel", "other"
+)
 
 
 category_keywords = {
@@ -69,236 +243,708 @@ category_keywords = {
     "other": ["other", "miscellaneous", "various", "different", "random", "general"]
 }
 
-def create_fresh_model(vocab_size=20000, embedding_dim=128, num_classes=11):
-    """Create a fresh model with the same architecture as in the notebook"""
-    logger.info(f"Creating a fresh model with vocab_size={vocab_size}, embedding_dim={embedding_dim}, num_classes={num_classes}")
-    
-    model = Sequential([
-        Embedding(input_dim=vocab_size, output_dim=embedding_dim, input_length=max_sequence_length),
-        SpatialDropout1D(0.2),
-        LSTM(embedding_dim, dropout=0.2, recurrent_dropout=0.2),
-        Dense(num_classes, activation='softmax')
-    ])
-    
-    model.compile(
-        loss='categorical_crossentropy',
-        optimizer='adam',
-        metrics=['accuracy']
+KEYWORD_CATEGORIES = tuple(category_keywords)
+KEYWORD_LENGTHS = np.array([len(keywords) for keywords in category_keywords.values()], dtype=np.float64)
+
+def group_keywords():
+    """Map each lowercased keyword to the indices of the categories listing it"""
+    keyword_categories = {}
+    for index, keywords in enumerate(category_keywords.values()):
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword.lower(), []).append(index)
+    return {keyword: tuple(indices) for keyword, indices in keyword_categories.items()}
+
+def build_keyword_automaton():
+    """Build one Aho-Corasick automaton over all category keywords, each mapped to (keyword, category indices)"""
+    automaton = ahocorasick.Automaton()
+    for keyword, keyword_categories in group_keywords().items():
+        automaton.add_word(keyword, (keyword, keyword_categories))
+    automaton.make_automaton()
+    return automaton
+
+def build_keyword_patterns():
+    """Precompile one word-bounded regex per keyword, used when pyahocorasick is not installed"""
+    return [
+        (re.compile(r'\b' + re.escape(keyword) + r'\b'), keyword_categories)
+        for keyword, keyword_categories in group_keywords().items()
+    ]
+
+if ahocorasick is not None:
+    keyword_automaton, keyword_patterns = build_keyword_automaton(), None
+else:
+    logger.warning("pyahocorasick is not installed; falling back to per-keyword regex matching")
+    keyword_automaton, keyword_patterns = None, build_keyword_patterns()
+is_word_char = re.compile(r'\w').match
+
+def tokenizer_vocab(model_tokenizer):
+    """Extract a Keras tokenizer's vocabulary and text normalization settings in the vocab.json layout"""
+    return {
+        "word_index": model_tokenizer.word_index,
+        "num_words": model_tokenizer.num_words,
+        "oov_token_id": model_tokenizer.word_index.get(model_tokenizer.oov_token),
+        "filters": model_tokenizer.filters,
+        "lower": model_tokenizer.lower,
+        "split": model_tokenizer.split,
+    }
+
+def build_tokenizer_encoder(model_tokenizer):
+    """Build the encoder for a Keras tokenizer, deferring to Keras for character-level or custom analyzers"""
+    if model_tokenizer.char_level or getattr(model_tokenizer, "analyzer", None) is not None:
+        return lambda text: model_tokenizer.texts_to_sequences([text])[0]
+    return build_encoder(tokenizer_vocab(model_tokenizer))
+
+def build_encoder(vocab):
+    """Build a single-text equivalent of tokenizer.texts_to_sequences that does one translate, split and dict lookup per word
+
+    The vocabulary is frozen at build time with words beyond num_words
+    already removed, so they fall through to the OOV id (or are dropped
+    without one) exactly as Keras does.
+    """
+    num_words = vocab["num_words"]
+    oov_index = vocab["oov_token_id"]
+    word_index = {
+        word: index for word, index in vocab["word_index"].items()
+        if not num_words or index < num_words
+    }
+    get = word_index.get
+    lower = vocab["lower"]
+    split = vocab["split"]
+    translate_map = str.maketrans({char: split for char in vocab["filters"]})
+
+    def encode(text):
+        if lower:
+            text = text.lower()
+
+        ids = [get(word, oov_index) for word in text.translate(translate_map).split(split) if word]
+        if oov_index is None:
+            ids = [index for index in ids if index is not None]
+
+        return ids
+
+    return encode
+
+def supports_dynamic_padding(model):
+    """Padding can only be trimmed if the time dimension is unbounded and padded positions are masked"""
+    embedding = next((layer for layer in model.layers if isinstance(layer, tf.keras.layers.Embedding)), None)
+    return model.input_shape[1] is None and embedding is not None and embedding.mask_zero
+
+def trace_inference(fn, input_spec, jit_compile=True):
+    """Wrap fn in a tf.function traced for input_spec, XLA-compiled when AI_XLA_JIT is enabled and compilation succeeds"""
+    if jit_compile and xla_jit:
+        try:
+            infer = tf.function(fn, input_signature=[input_spec], jit_compile=True)
+            infer(tf.zeros((1, input_spec.shape[1] or max_sequence_length), dtype=input_spec.dtype))
+            return infer
+        except Exception as e:
+            logger.warning(f"XLA compilation failed, falling back to graph execution: {e}")
+
+    infer = tf.function(fn, input_signature=[input_spec])
+    infer.get_concrete_function()
+    return infer
+
+def build_predict_fn(model, sequence_length):
+    """Wrap the Keras model in a tf.function traced once for int32 (batch, sequence_length) input"""
+    infer = trace_inference(lambda x: model(x, training=False), tf.TensorSpec((None, sequence_length), tf.int32))
+
+    def predict(padded):
+        return infer(tf.constant(padded, dtype=tf.int32)).numpy()
+
+    return predict
+
+def build_saved_model_predict_fn(model_path, jit_compile=True):
+    """Load a SavedModel (plain or TF-TRT) and serve its default signature, XLA-compiled when AI_XLA_JIT is enabled"""
+    loaded = tf.saved_model.load(model_path)
+    signature = loaded.signatures["serving_default"]
+    input_name, input_spec = next(iter(signature.structured_input_signature[1].items()))
+    output_name = next(iter(signature.structured_outputs))
+    infer = trace_inference(
+        lambda x: signature(**{input_name: x})[output_name],
+        tf.TensorSpec(input_spec.shape, input_spec.dtype),
+        jit_compile,
     )
-    
-    logger.info("Fresh model created successfully")
-    return model
-
-def create_fresh_tokenizer(num_words=20000):
-    """Create a new tokenizer if we can't load the saved one"""
-    logger.info(f"Creating a fresh tokenizer with num_words={num_words}")
-    
-    
-    new_tokenizer = Tokenizer(num_words=num_words, oov_token="<OOV>")
-    
-    
-    
-    common_words = [
-        "the", "be", "to", "of", "and", "a", "in", "that", "have", "I",
-        "it", "for", "not", "on", "with", "he", "as", "you", "do", "at",
-        "technology", "health", "education", "entertainment", "science", 
-        "sports", "politics", "business", "lifestyle", "travel"
+
+    def predict(padded):
+        return infer(tf.constant(padded, dtype=input_spec.dtype)).numpy()
+
+    return loaded, predict
+
+def build_tflite_predict_fn(model_path, num_threads):
+    """Load a TFLite model; the interpreters are not thread-safe, so only the batching thread may call it
+
+    Resizing an interpreter re-plans and reallocates all of its tensors, so
+    instead of resizing on every batch-shape change, one interpreter is
+    allocated per padded input shape the first time that shape is seen
+    (warm_up covers every bucket) and reused from then on.
+    """
+    num_threads = int(os.environ.get("AI_TFLITE_THREADS", num_threads))
+    interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+    input_details = interpreter.get_input_details()[0]
+    output_index = interpreter.get_output_details()[0]["index"]
+    interpreters = {}
+
+    def interpreter_for(shape):
+        shape_interpreter = interpreters.get(shape)
+        if shape_interpreter is None:
+            shape_interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+            shape_interpreter.resize_tensor_input(input_details["index"], shape)
+            shape_interpreter.allocate_tensors()
+            interpreters[shape] = shape_interpreter
+        return shape_interpreter
+
+    def predict(padded):
+        shape_interpreter = interpreter_for(padded.shape)
+        shape_interpreter.set_tensor(input_details["index"], np.ascontiguousarray(padded, dtype=input_details["dtype"]))
+        shape_interpreter.invoke()
+        return shape_interpreter.get_tensor(output_index)
+
+    predict.input_dtype = input_details["dtype"]
+    return predict
+
+ONNX_INPUT_TYPES = {
+    "tensor(float)": np.float32,
+    "tensor(int32)": np.int32,
+    "tensor(int64)": np.int64,
+}
+
+def build_onnx_predict_fn(model_path):
+    """Load an ONNX model into an ONNX Runtime CPU session with all graph optimizations enabled"""
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    session = onnxruntime.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+
+    model_input = session.get_inputs()[0]
+    input_name = model_input.name
+    input_dtype = ONNX_INPUT_TYPES[model_input.type]
+
+    def predict(padded):
+        return session.run(None, {input_name: padded.astype(input_dtype, copy=False)})[0]
+
+    predict.input_dtype = input_dtype
+    return predict
+
+def warm_up(model_predict_fn, model_dynamic_padding):
+    """Run a dummy batch of every padded shape so tracing, XLA compilation and buffer allocation happen before the first real request"""
+    started = time.monotonic()
+    sequence_lengths = LENGTH_BUCKETS if model_dynamic_padding else (max_sequence_length,)
+    for batch_size in BATCH_BUCKETS:
+        for sequence_length in sequence_lengths:
+            for _ in range(WARM_UP_ROUNDS):
+                model_predict_fn(np.zeros((batch_size, sequence_length), dtype=np.int32))
+    logger.info(f"Model warm-up finished in {time.monotonic() - started:.2f}s")
+
+BACKEND_FORMATS = {
+    "auto": ("onnx", "tflite", "savedmodel"),
+    "keras": (),
+    "savedmodel": ("savedmodel",),
+    "tflite": ("tflite",),
+    "tflite_int8": ("tflite_int8",),
+    "onnx": ("onnx",),
+    "tensorrt": ("tensorrt",),
+}
+MODEL_FORMAT_PATHS = {
+    "keras": MODEL_PATH,
+    "savedmodel": SAVED_MODEL_PATH,
+    "tflite": TFLITE_MODEL_PATH,
+    "tflite_int8": TFLITE_INT8_MODEL_PATH,
+    "onnx": ONNX_MODEL_PATH,
+    "tensorrt": TRT_MODEL_PATH,
+}
+
+def model_format_for_path(model_path):
+    """Infer the serving format of a model artifact from its path"""
+    if os.path.isdir(model_path):
+        return "tensorrt" if model_backend == "tensorrt" else "savedmodel"
+
+    extension = os.path.splitext(model_path)[1]
+    if extension == ".tflite":
+        return "tflite_int8" if model_backend == "tflite_int8" else "tflite"
+    if extension == ".onnx":
+        return "onnx"
+    return "keras"
+
+def resolve_model_candidates():
+    """Resolve the (format, path) pairs load_models tries in order; AI_MODEL_PATH pins a single artifact"""
+    pinned_path = os.environ.get("AI_MODEL_PATH")
+    if pinned_path:
+        return [(model_format_for_path(pinned_path), pinned_path)]
+
+    formats = [
+        model_format for model_format in BACKEND_FORMATS.get(model_backend, ())
+        if model_format != "onnx" or onnxruntime is not None
     ]
-    
-    
-    new_tokenizer.fit_on_texts([" ".join(common_words)])
-    
-    logger.info(f"Fresh tokenizer created with {len(new_tokenizer.word_index)} words")
-    return new_tokenizer
+    return [(model_format, MODEL_FORMAT_PATHS[model_format]) for model_format in formats] + [("keras", MODEL_PATH)]
+
+def resolve_tokenizer_candidates():
+    """Resolve the (format, path) pairs tried for the tokenizer in order; AI_TOKENIZER_PATH pins a single file"""
+    pinned_path = os.environ.get("AI_TOKENIZER_PATH")
+    if pinned_path:
+        return [("vocab" if pinned_path.endswith(".json") else "pickle", pinned_path)]
+    return [("vocab", VOCAB_PATH), ("pickle", TOKENIZER_PATH)]
+
+MODEL_CANDIDATES = resolve_model_candidates()
+TOKENIZER_CANDIDATES = resolve_tokenizer_candidates()
+
+def load_model_format(model_format, model_path):
+    """Load one model artifact; returns (model, predict_fn, dynamic_padding)"""
+    if model_format == "onnx":
+        return None, build_onnx_predict_fn(model_path), False
+
+    import_tensorflow()
+    if model_format == "tflite":
+        return None, build_tflite_predict_fn(model_path, intra_op_threads), False
+    if model_format == "tflite_int8":
+        return None, build_tflite_predict_fn(model_path, 1), False
+    if model_format in ("savedmodel", "tensorrt"):
+        return build_saved_model_predict_fn(model_path, jit_compile=model_format == "savedmodel") + (False,)
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    return (model,) + build_keras_predict_fn(model)
+
+def build_keras_predict_fn(model):
+    """Wrap a Keras model for inference; returns (predict_fn, dynamic_padding)"""
+    model_dynamic_padding = supports_dynamic_padding(model)
+    logger.info(f"Padding inputs to {'the longest sequence in each batch' if model_dynamic_padding else max_sequence_length}")
+    return build_predict_fn(model, None if model_dynamic_padding else max_sequence_length), model_dynamic_padding
+
+def load_tokenizer_format(tokenizer_format, tokenizer_path):
+    """Load one tokenizer artifact; returns (tokenizer, encoder)"""
+    if tokenizer_format == "vocab":
+        with open(tokenizer_path, 'rb') as handle:
+            vocab = orjson.loads(handle.read())
+        return vocab, build_encoder(vocab)
+
+    import_tensorflow()
+    with open(tokenizer_path, 'rb') as handle:
+        model_tokenizer = pickle.load(handle)
+    return model_tokenizer, build_tokenizer_encoder(model_tokenizer)
 
 def load_models():
     """Load the pre-trained TensorFlow model and tokenizer"""
-    global thread_model, tokenizer, using_fresh_model
+    global thread_model, predict_fn, tokenizer, encode_text, dynamic_padding, using_fresh_model, health_status, health_etag
 
     try:
-        
-        possible_model_paths = [
-            "/app/models/thread_category_model.h5",
-            "/app/thread_category_model.h5",
-            "./thread_category_model.h5",
-            "./models/thread_category_model.h5"
-        ]
-        
-        possible_tokenizer_paths = [
-            "/app/models/tokenizer.pickle",
-            "/app/tokenizer.pickle",
-            "./tokenizer.pickle",
-            "./models/tokenizer.pickle"
-        ]
-
-        
-        model_loaded = False
-        for model_path in possible_model_paths:
-            try:
-                if os.path.exists(model_path):
-                    logger.info(f"Found model at {model_path}, attempting to load")
-                    
-                    try:
-                        thread_model = load_model(model_path, compile=False)
-                    except:
-                        thread_model = load_model(model_path, compile=False, custom_objects={})
-                    
-                    logger.info(f"Successfully loaded model from {model_path}")
-                    model_loaded = True
-                    break
-            except Exception as e:
-                logger.info(f"Error loading model from {model_path}: {e}")
+        model = None
+        model_predict_fn = None
+        model_dynamic_padding = False
+
+        # Only look for a tokenizer (whose pickle imports TensorFlow) if there is a model to use it with
+        model_candidates = [(model_format, model_path) for model_format, model_path in MODEL_CANDIDATES if os.path.exists(model_path)]
+
+        model_tokenizer = None
+        model_encoder = None
+        for tokenizer_format, tokenizer_path in TOKENIZER_CANDIDATES if model_candidates else ():
+            if not os.path.exists(tokenizer_path):
                 continue
-                
-        
-        if not model_loaded:
-            logger.info("Could not load model from disk, creating a fresh model")
-            thread_model = create_fresh_model()
-            using_fresh_model = True
-                
-        
-        thread_model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-
-        
-        tokenizer_loaded = False
-        for tokenizer_path in possible_tokenizer_paths:
             try:
-                if os.path.exists(tokenizer_path):
-                    logger.info(f"Found tokenizer at {tokenizer_path}, attempting to load")
-                    with open(tokenizer_path, 'rb') as handle:
-                        tokenizer = pickle.load(handle)
-                    logger.info(f"Successfully loaded tokenizer from {tokenizer_path}")
-                    tokenizer_loaded = True
-                    break
+                logger.info(f"Found {tokenizer_format} tokenizer at {tokenizer_path}, attempting to load")
+                model_tokenizer, model_encoder = load_tokenizer_format(tokenizer_format, tokenizer_path)
+                logger.info(f"Using {tokenizer_format} tokenizer from {tokenizer_path}")
+                break
             except Exception as e:
-                logger.info(f"Error loading tokenizer from {tokenizer_path}: {e}")
-                continue
-                
-        
-        if not tokenizer_loaded:
-            logger.info("Could not load tokenizer from any location, creating a fresh one")
-            tokenizer = create_fresh_tokenizer()
-            using_fresh_model = True
-
-        logger.info("Model and tokenizer loaded successfully")
+                logger.info(f"Error loading {tokenizer_format} tokenizer from {tokenizer_path}: {e}")
+
+        if model_tokenizer is not None:
+            for model_format, model_path in model_candidates:
+                try:
+                    logger.info(f"Found {model_format} model at {model_path}, attempting to load")
+                    model, model_predict_fn, model_dynamic_padding = load_model_format(model_format, model_path)
+                    logger.info(f"Serving {model_format} model from {model_path}")
+                    break
+                except Exception as e:
+                    logger.info(f"Error loading {model_format} model from {model_path}: {e}")
+
+        fresh = model_predict_fn is None
+        if fresh:
+            if not allow_fresh:
+                logger.error("Could not load the model and tokenizer from disk and AI_ALLOW_FRESH is disabled")
+                return False
+            logger.info("Could not load the model and tokenizer from disk, falling back to keyword-based prediction")
+            model, model_tokenizer, model_encoder = None, None, None
+        else:
+            warm_up(model_predict_fn, model_dynamic_padding)
+
+        thread_model = model
+        predict_fn = model_predict_fn
+        tokenizer = model_tokenizer
+        encode_text = model_encoder
+        dynamic_padding = model_dynamic_padding
+        using_fresh_model = fresh
+        tokenize.cache_clear()
+        with prediction_cache_lock:
+            prediction_cache.clear()
+
+        health_status = {"status": "healthy", "models_loaded": True, "using_fresh_model": fresh}
+        health_etag = hashlib.md5(orjson.dumps(health_status)).hexdigest()
+
+        logger.info("Keyword-based prediction ready" if fresh else "Model and tokenizer loaded successfully")
         return True
     except Exception as e:
         logger.error(f"Error loading models: {e}")
         return False
 
+def load_initial_models():
+    """Load the model for this process once and open the prediction gate, whether or not loading succeeded"""
+    global models_ok, health_status, health_etag
+
+    models_ok = load_models()
+    if not models_ok:
+        health_status = {"status": "unavailable", "models_loaded": False, "using_fresh_model": False}
+        health_etag = hashlib.md5(orjson.dumps(health_status)).hexdigest()
+    models_ready.set()
+
+def ensure_model_loader():
+    """Start loading the model on a background thread in this process
+
+    Called from gunicorn's post_fork hook, so the fork-unsafe TensorFlow,
+    ONNX Runtime and TFLite thread pools are only ever created in the
+    worker, and the worker keeps heartbeating while the model loads and
+    warms up. Servers without the hook start it on their first request.
+    """
+    global model_loader
+
+    if model_loader is not None:
+        return
+
+    with model_loader_lock:
+        if model_loader is None:
+            model_loader = threading.Thread(target=load_initial_models, name="model-loader", daemon=True)
+            model_loader.start()
+
+def keyword_match_counts(content):
+    """Count how many distinct keywords of each category appear in content, in a single automaton pass
+
+    Returns an int32 array of counts ordered like KEYWORD_CATEGORIES.
+
+    Hits are only kept on word boundaries (as r'\bkeyword\b' would), and a
+    keyword counts once however often it appears. Without pyahocorasick the
+    precompiled per-keyword patterns are searched instead.
+    """
+    content = content.lower()
+
+    if keyword_automaton is None:
+        matched = [keyword_categories for pattern, keyword_categories in keyword_patterns if pattern.search(content)]
+    else:
+        matched = {}
+        for end, (keyword, keyword_categories) in keyword_automaton.iter(content):
+            start = end - len(keyword) + 1
+            if (start > 0 and is_word_char(content, start - 1)) or is_word_char(content, end + 1):
+                continue
+            matched[keyword] = keyword_categories
+        matched = matched.values()
+
+    match_counts = np.zeros(len(KEYWORD_CATEGORIES), dtype=np.int32)
+    for keyword_categories in matched:
+        match_counts[list(keyword_categories)] += 1
+
+    return match_counts
+
+def keyword_scores(match_counts):
+    """Turn per-category keyword counts into confidences, scaled by the size of each category's keyword list"""
+    return np.where(match_counts > 0, match_counts / KEYWORD_LENGTHS * 0.8 + 0.1, 0.02)
+
 def predict_by_keywords(content):
     """Use keyword matching to predict category if we're using a fresh model"""
-    logger.info(f"Using keyword-based prediction for: {content}")
-    content = content.lower()
-    
-    
-    category_scores = {}
-    for category, keywords in category_keywords.items():
-        match_count = 0
-        for keyword in keywords:
-            
-            if re.search(r'\b' + re.escape(keyword) + r'\b', content):
-                match_count += 1
-        
-        
-        
-        if match_count > 0:
-            category_scores[category] = float(match_count) / len(keywords) * 0.8 + 0.1
-        else:
-            category_scores[category] = 0.02  
-    
-    
-    if not category_scores:
-        return {"category": "other", "confidence": 0.1}
-    
-    top_category = max(category_scores, key=category_scores.get)
-    top_confidence = category_scores[top_category]
-    
-    return {"category": top_category, "confidence": top_confidence}
+    logger.debug("Using keyword-based prediction for: %.50s", content)
+
+    category_scores = keyword_scores(keyword_match_counts(content))
+
+    top_index = int(category_scores.argmax())
+    return {"category": KEYWORD_CATEGORIES[top_index], "confidence": category_scores[top_index]}
+
+@lru_cache(maxsize=TOKENIZE_CACHE_SIZE)
+def tokenize(content):
+    """Convert content to a read-only int32 array of token ids, caching repeated content"""
+    sequence = np.array(encode_text(content), dtype=np.int32)
+    sequence.setflags(write=False)
+    return sequence
+
+def run_batch(batch, buffer):
+    """Pad and predict a batch of queued token sequences in a single model call
+
+    Sequences are copied into the batching thread's reusable buffer,
+    converting to its dtype, with pad_sequences semantics: zeros after the
+    tokens, keeping the last tokens when a sequence is too long. The batch
+    is padded with zero rows up to the next BATCH_BUCKETS size (and, with
+    dynamic padding, to the next LENGTH_BUCKETS length) so the model only
+    sees warmed-up shapes; outputs for the padding rows are discarded.
+    """
+    batch = [(sequence, future) for sequence, future in batch if future.set_running_or_notify_cancel()]
+    if not batch:
+        return
 
-@app.route("/health", methods=["GET"])
-def health_check():
-    """Health check endpoint"""
-    global thread_model, tokenizer
-
-    status = {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "models_loaded": thread_model is not None and tokenizer is not None,
-        "using_fresh_model": using_fresh_model
+    try:
+        sequences = [sequence for sequence, _ in batch]
+
+        padded_length = max_sequence_length
+        if dynamic_padding:
+            padded_length = bucket_for(max(len(sequence) for sequence in sequences), LENGTH_BUCKETS)
+
+        padded = buffer[:bucket_for(len(batch), BATCH_BUCKETS), :padded_length]
+        padded.fill(0)
+        for row, sequence in zip(padded, sequences):
+            sequence = sequence[-padded_length:]
+            row[:len(sequence)] = sequence
+
+        predictions = predict_fn(padded)
+    except Exception as e:
+        for _, future in batch:
+            future.set_exception(e)
+        return
+
+    for (_, future), prediction in zip(batch, predictions):
+        future.set_result(prediction)
+
+def batch_loop():
+    """Collect up to MAX_BATCH requests or wait MAX_LATENCY_MS, then run them together
+
+    The input buffer is allocated in the dtype the current predict_fn
+    consumes (int32 unless it declares input_dtype), so batches are passed
+    through without a conversion copy; it is reallocated if a reload
+    switches to a backend with a different input dtype.
+    """
+    buffer = None
+
+    while True:
+        batch = [batch_queue.get()]
+        deadline = time.monotonic() + MAX_LATENCY_MS / 1000.0
+
+        while len(batch) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(batch_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        input_dtype = getattr(predict_fn, "input_dtype", np.int32)
+        if buffer is None or buffer.dtype != input_dtype:
+            buffer = np.zeros((MAX_BATCH, max_sequence_length), dtype=input_dtype)
+
+        run_batch(batch, buffer)
+
+def ensure_batch_worker():
+    """Start the batching thread in this process (threads do not survive the gunicorn fork)"""
+    global batch_worker
+
+    if batch_worker is not None and batch_worker.is_alive():
+        return
+
+    with batch_worker_lock:
+        if batch_worker is None or not batch_worker.is_alive():
+            batch_worker = threading.Thread(target=batch_loop, name="predict-batcher", daemon=True)
+            batch_worker.start()
+
+def submit_prediction(content):
+    """Tokenize content on the calling thread and queue it for the batching thread; returns a Future resolving to the model output row"""
+    sequence = tokenize(content)
+    ensure_batch_worker()
+
+    future = Future()
+    batch_queue.put((sequence, future))
+    return future
+
+def cached_prediction(content):
+    """Return the cached model output row for content, or None"""
+    with prediction_cache_lock:
+        prediction = prediction_cache.get(content)
+        if prediction is not None:
+            prediction_cache.move_to_end(content)
+        return prediction
+
+def cache_prediction(content, prediction):
+    """Remember a model output row for content, evicting the least recently used beyond PREDICTION_CACHE_SIZE"""
+    if PREDICTION_CACHE_SIZE <= 0:
+        return
+
+    with prediction_cache_lock:
+        prediction_cache[content] = prediction
+        prediction_cache.move_to_end(content)
+        if len(prediction_cache) > PREDICTION_CACHE_SIZE:
+            prediction_cache.popitem(last=False)
+
+def build_result(prediction, all_categories=False):
+    """Turn a model output row into the response payload"""
+    top_index = int(prediction.argmax())
+
+    result = {
+        "category": LABELS[top_index],
+        "confidence": prediction[top_index]
     }
+    if all_categories:
+        result["all_categories"] = dict(zip(LABELS, prediction))
+    logger.debug("Prediction result: %s (confidence=%.4f)", result["category"], result["confidence"])
+
+    return result
+
+def keyword_fast_path(content):
+    """Answer from keyword hits alone when they are conclusive; returns (result, branch), result None meaning run the model
+
+    Branches, checked in order (confident and short only with AI_KEYWORD_FAST_PATH=all):
+      dominant  - the top category has FAST_PATH_MIN_HITS hits and leads by FAST_PATH_MIN_MARGIN
+      confident - the keyword score is above FAST_PATH_MIN_KEYWORD_CONFIDENCE
+      short     - fewer than FAST_PATH_SHORT_WORDS words and a single best keyword score, too little text for the model
+      model     - none of the above
+    """
+    match_counts = keyword_match_counts(content)
+    top_index = int(match_counts.argmax())
+    top_hits, runner_up_hits = match_counts[top_index], np.partition(match_counts, -2)[-2]
+
+    if top_hits >= FAST_PATH_MIN_HITS and top_hits - runner_up_hits >= FAST_PATH_MIN_MARGIN:
+        return {"category": KEYWORD_CATEGORIES[top_index], "confidence": FAST_PATH_CONFIDENCE}, "dominant"
+
+    if keyword_fast_path_mode != "all" or top_hits == 0:
+        return None, "model"
+
+    category_scores = keyword_scores(match_counts)
+    top_index = int(category_scores.argmax())
+    result = {"category": KEYWORD_CATEGORIES[top_index], "confidence": category_scores[top_index]}
+    if result["confidence"] > FAST_PATH_MIN_KEYWORD_CONFIDENCE:
+        return result, "confident"
+    if np.partition(category_scores, -2)[-2] < category_scores[top_index] and len(content.split()) < FAST_PATH_SHORT_WORDS:
+        return result, "short"
+    return None, "model"
+
+def record_fast_path(branch):
+    """Track which branch each request took and log the fast path hit rate periodically; the counts are also served by /stats"""
+    with fast_path_stats_lock:
+        fast_path_stats[branch] += 1
+        fast_path_stats["requests"] += 1
+        stats = dict(fast_path_stats)
+
+    if stats["requests"] % FAST_PATH_LOG_INTERVAL == 0:
+        requests = stats["requests"]
+        logger.info(
+            "Keyword fast path hit rate: %.1f%% (dominant %d, confident %d, short %d, model %d of %d)",
+            100.0 * (requests - stats["model"]) / requests,
+            stats["dominant"], stats["confident"], stats["short"], stats["model"], requests,
+        )
+
+def predict_content(content, all_categories=False):
+    """Start predicting content; returns a Future resolving to the response payload
+
+    Flask handlers block on the Future while the ASGI entrypoint awaits it,
+    so both share the same batching thread.
+    """
+    result = Future()
+
+    if using_fresh_model:
+        result.set_result(predict_by_keywords(content))
+        return result
+
+    if keyword_fast_path_mode != "off" and not all_categories:
+        fast_result, branch = keyword_fast_path(content)
+        record_fast_path(branch)
+        logger.debug("Prediction branch %s for: %.50s", branch, content)
+        if fast_result is not None:
+            result.set_result(fast_result)
+            return result
+
+    prediction = cached_prediction(content)
+    if prediction is not None:
+        result.set_result(build_result(prediction, all_categories))
+        return result
+
+    def finish(prediction):
+        if not result.set_running_or_notify_cancel():
+            return
+        try:
+            prediction = prediction.result()
+            cache_prediction(content, prediction)
+            result.set_result(build_result(prediction, all_categories))
+        except Exception as e:
+            result.set_exception(e)
+
+    submit_prediction(content).add_done_callback(finish)
+    return result
+
+def json_response(payload, status=200):
+    """Serialize payload straight to a JSON response with orjson, NumPy scalars included, bypassing jsonify"""
+    return app.response_class(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), status=status, mimetype="application/json")
+
+def not_modified(etag):
+    """Return a 304 response if the client's If-None-Match already holds etag, otherwise None"""
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+@app.before_request
+def start_model_loader():
+    """Start loading the model on the first request when no post_fork hook has done so"""
+    ensure_model_loader()
 
-    return jsonify(status)
+@app.route("/health", methods=["GET"])
+def health_check():
+    """Health check endpoint; the ETag covers everything but the timestamp"""
+    etag = health_etag
+    response = not_modified(etag)
+    if response is None:
+        response = jsonify({**health_status, "timestamp": time.time()})
+        response.set_etag(etag)
+    return response
+
+@app.route("/stats", methods=["GET"])
+def get_stats():
+    """Keyword fast path counters for this worker; never cached since they change with every prediction"""
+    with fast_path_stats_lock:
+        stats = dict(fast_path_stats)
+    response = jsonify({"fast_path": stats})
+    response.cache_control.no_store = True
+    return response
 
 @app.route("/categories", methods=["GET"])
 def get_categories():
     """Return categories for the application"""
-    categories_list = [
-        {"id": category_id, "name": name} 
-        for category_id, name in categories.items()
-    ]
+    response = not_modified(CATEGORIES_ETAG)
+    if response is None:
+        response = Response(CATEGORIES_JSON, mimetype="application/json")
+        response.set_etag(CATEGORIES_ETAG)
+    return response
+
+@app.route("/reload", methods=["POST"])
+def reload_models():
+    """Reload the model and tokenizer from disk; requires the AI_ADMIN_TOKEN bearer token
+
+    A failed reload leaves the previously loaded model in service.
+    """
+    global models_ok
+
+    if not models_ready.is_set():
+        return jsonify({"error": "Prediction models are still loading"}), 503
+
+    admin_token = os.environ.get("AI_ADMIN_TOKEN")
+    provided = request.headers.get("Authorization", "")
+    if not admin_token or not hmac.compare_digest(provided.encode(), f"Bearer {admin_token}".encode()):
+        return jsonify({"error": "Unauthorized"}), 401
 
-    return jsonify({
-        "success": True,
-        "categories": categories_list
-    })
+    if not load_models():
+        return jsonify({"error": "Failed to load prediction models"}), 503
+    models_ok = True
+
+    return jsonify({"success": True, "using_fresh_model": using_fresh_model})
 
 @app.route("/predict/category", methods=["POST"])
 def predict_category():
     """Predict the category of content using the pre-trained model"""
-    global thread_model, tokenizer, using_fresh_model
+    if not models_ready.is_set():
+        return json_response({"error": "Prediction models are still loading"}, 503)
+    if not models_ok:
+        return json_response({"error": "Prediction models unavailable"}, 503)
 
     try:
         data = request.json
         if not data or 'content' not in data:
-            return jsonify({"error": "Missing content field"}), 400
+            return json_response({"error": "Missing content field"}, 400)
 
         content = data['content']
+        logger.debug("Received category prediction request for: %.50s", content)
 
-        
-        if thread_model is None or tokenizer is None:
-            success = load_models()
-            if not success:
-                return jsonify({"error": "Failed to load prediction models"}), 500
-
-        
-        if using_fresh_model:
-            result = predict_by_keywords(content)
-            return jsonify(result)
-
-        
-        
-        sequence = tokenizer.texts_to_sequences([content])
-        padded = pad_sequences(sequence, maxlen=max_sequence_length, padding='post')
-
-        
-        prediction = thread_model.predict(padded)[0]
-
-        
-        category_scores = {label_mapping[i]: float(score) for i, score in enumerate(prediction)}
-
-        
-        top_category = max(category_scores, key=category_scores.get)
-        top_confidence = category_scores[top_category]
-
-        result = {
-            "category": top_category,
-            "confidence": float(top_confidence)
-        }
-
-        return jsonify(result)
+        return json_response(predict_content(content, data.get('all_categories')).result())
 
     except Exception as e:
-        logger.error(f"Error during prediction: {e}")
-        return jsonify({"error": str(e)}), 500
-
-if __name__ == "__main__":
-    
-    load_models()
-
-    
-    port = int(os.environ.get("PORT", 5000))
-    debug = os.environ.get("FLASK_ENV") == "development"
-
-    logger.info(f"Starting AI service on port {port}")
-    app.run(host="0.0.0.0", port=port, debug=debug)
\ No newline at end of file
+        logger.error("Error during prediction: %s", e)
+        return json_response({"error": str(e)}, 500)
@@ -0,0 +1,63 @@
+import asyncio
+import os
+
+import orjson
+from a2wsgi import WSGIMiddleware
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+
+import app as service
+
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[os.environ.get("CORS_ORIGIN", "http://localhost:3000")],
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+@app.on_event("startup")
+async def start_model_loader():
+    """Start loading the model in this worker process as soon as it starts serving"""
+    service.ensure_model_loader()
+
+
+@app.post("/predict/category")
+async def predict_category(request: Request):
+    """Predict the category of content, awaiting the shared batcher without tying up a thread per request
+
+    Keyword matching, tokenization and the cache lookups run in the
+    threadpool so they never block the event loop; only the wait for the
+    batched model call is awaited here.
+    """
+    if not service.models_ready.is_set():
+        return ORJSONResponse({"error": "Prediction models are still loading"}, status_code=503)
+    if not service.models_ok:
+        return ORJSONResponse({"error": "Prediction models unavailable"}, status_code=503)
+
+    try:
+        data = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        data = None
+
+    if not isinstance(data, dict) or 'content' not in data:
+        return ORJSONResponse({"error": "Missing content field"}, status_code=400)
+
+    try:
+        content = data['content']
+        service.logger.debug("Received category prediction request for: %.50s", content)
+
+        prediction = await run_in_threadpool(service.predict_content, content, data.get('all_categories'))
+        result = await asyncio.wrap_future(prediction)
+        return ORJSONResponse(result)
+    except Exception as e:
+        service.logger.error("Error during prediction: %s", e)
+        return ORJSONResponse({"error": str(e)}, status_code=500)
+
+
+app.mount("/", WSGIMiddleware(service.app))
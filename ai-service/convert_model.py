@@ -0,0 +1,269 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import pickle
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO"),
+    format="%(asctime)s [%(levelname)s] - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRAINING_DIR = os.path.join(BASE_DIR, "..", "ai-training")
+DEFAULT_MODEL_PATH = os.path.join(BASE_DIR, "models", "thread_category_model.h5")
+DEFAULT_SAVED_MODEL_PATH = os.path.join(BASE_DIR, "models", "thread_category_model")
+DEFAULT_TRT_PATH = os.path.join(BASE_DIR, "models", "thread_category_model_trt")
+DEFAULT_ONNX_PATH = os.path.join(BASE_DIR, "models", "thread_category_model.onnx")
+DEFAULT_TFLITE_PATH = os.path.join(BASE_DIR, "models", "thread_category_model.tflite")
+DEFAULT_TOKENIZER_PATH = os.path.join(BASE_DIR, "models", "tokenizer.pickle")
+DEFAULT_VOCAB_PATH = os.path.join(BASE_DIR, "models", "vocab.json")
+DEFAULT_SAMPLES_PATH = os.path.join(TRAINING_DIR, "train.csv")
+DEFAULT_EVAL_PATH = os.path.join(TRAINING_DIR, "test.csv")
+
+MAX_SEQUENCE_LENGTH = int(os.environ.get("MAX_SEQ_LEN", 100))
+REPRESENTATIVE_SAMPLES = 100
+ONNX_OPSET = 15
+
+
+def load_tokenizer(tokenizer_path):
+    """Load the pickled Keras tokenizer used by the service"""
+    with open(tokenizer_path, 'rb') as handle:
+        return pickle.load(handle)
+
+
+def load_samples(path, limit):
+    """Read evenly spaced (content, label) pairs from an ai-training CSV, joining title and description as in training"""
+    with open(path, newline='', encoding='utf-8') as handle:
+        rows = list(csv.DictReader(handle))
+
+    step = max(1, len(rows) // limit)
+    samples = rows[::step][:limit]
+    return (
+        [row["Title"] + " " + row["Description"] for row in samples],
+        np.array([int(row["Class Index"]) - 1 for row in samples]),
+    )
+
+
+def encode(tokenizer, texts, dtype):
+    """Tokenize and pad texts the same way the service does"""
+    sequences = tokenizer.texts_to_sequences(texts)
+    return pad_sequences(sequences, maxlen=MAX_SEQUENCE_LENGTH, padding='post').astype(dtype)
+
+
+def run_tflite(tflite_path, inputs):
+    """Run a whole input matrix through a TFLite model"""
+    interpreter = tf.lite.Interpreter(model_path=tflite_path)
+    input_details = interpreter.get_input_details()[0]
+    interpreter.resize_tensor_input(input_details["index"], inputs.shape)
+    interpreter.allocate_tensors()
+
+    interpreter.set_tensor(input_details["index"], inputs.astype(input_details["dtype"]))
+    interpreter.invoke()
+    return interpreter.get_tensor(interpreter.get_output_details()[0]["index"])
+
+
+def export_vocab(tokenizer_path, output_path):
+    """Write the tokenizer's vocabulary and text normalization settings as JSON, so the service can skip unpickling it"""
+    tokenizer = load_tokenizer(tokenizer_path)
+    if tokenizer.char_level or getattr(tokenizer, "analyzer", None) is not None:
+        raise ValueError("Only word-level tokenizers without a custom analyzer can be exported")
+
+    num_words = tokenizer.num_words
+    vocab = {
+        "word_index": {
+            word: index for word, index in tokenizer.word_index.items()
+            if not num_words or index < num_words
+        },
+        "num_words": num_words,
+        "oov_token_id": tokenizer.word_index.get(tokenizer.oov_token),
+        "filters": tokenizer.filters,
+        "lower": tokenizer.lower,
+        "split": tokenizer.split,
+    }
+
+    with open(output_path, 'w', encoding='utf-8') as handle:
+        json.dump(vocab, handle, ensure_ascii=False)
+
+    logger.info(f"Wrote {len(vocab['word_index'])} words to {output_path}")
+
+
+def convert_saved_model(model_path, output_path):
+    """Export the Keras model as an inference-only SavedModel taking int32 token ids"""
+    model = tf.keras.models.load_model(model_path, compile=False)
+
+    @tf.function(input_signature=[tf.TensorSpec((None, model.input_shape[1]), tf.int32, name="tokens")])
+    def serve(tokens):
+        return {"probabilities": model(tokens, training=False)}
+
+    model.save(output_path, save_format="tf", include_optimizer=False, signatures={"serving_default": serve})
+
+    logger.info(f"Wrote SavedModel to {output_path}")
+
+
+def convert_onnx(model_path, output_path):
+    """Export the Keras model to ONNX with an int32 token input, for the onnx serving backend (requires tf2onnx)"""
+    import tf2onnx
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    input_signature = (tf.TensorSpec((None, model.input_shape[1]), tf.int32, name="tokens"),)
+    tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=ONNX_OPSET, output_path=output_path)
+
+    logger.info(f"Wrote ONNX model to {output_path}")
+
+
+def convert_tensorrt(saved_model_path, output_path, precision, tokenizer_path, samples_path):
+    """Convert the exported SavedModel into a TF-TRT SavedModel
+
+    Requires a GPU build of TensorFlow with TensorRT. INT8 is calibrated on
+    training samples and falls back to FP16 if calibration fails.
+    """
+    conversion_params = tf.experimental.tensorrt.ConversionParams(
+        precision_mode=precision.upper(),
+        use_calibration=precision == "int8",
+    )
+    converter = tf.experimental.tensorrt.Converter(
+        input_saved_model_dir=saved_model_path,
+        conversion_params=conversion_params,
+    )
+
+    if precision == "int8":
+        texts, _ = load_samples(samples_path, REPRESENTATIVE_SAMPLES)
+        inputs = encode(load_tokenizer(tokenizer_path), texts, np.int32)
+
+        def calibration_input_fn():
+            for row in inputs:
+                yield (tf.constant(row[np.newaxis, :]),)
+
+        try:
+            converter.convert(calibration_input_fn=calibration_input_fn)
+        except Exception as e:
+            logger.warning(f"INT8 calibration failed, falling back to FP16: {e}")
+            return convert_tensorrt(saved_model_path, output_path, "fp16", tokenizer_path, samples_path)
+    else:
+        converter.convert()
+
+    def build_input_fn():
+        yield (tf.zeros((1, MAX_SEQUENCE_LENGTH), dtype=tf.int32),)
+
+    converter.build(input_fn=build_input_fn)
+    converter.save(output_path)
+
+    logger.info(f"Wrote {precision} TF-TRT model to {output_path}")
+
+
+def convert_tflite(model_path, output_path, quantization, tokenizer_path, samples_path):
+    """Convert the Keras model into a TFLite flatbuffer for the tflite serving backend
+
+    quantization is one of:
+      none    - float32 weights and activations
+      dynamic - int8 weights, float32 activations (dynamic-range quantization)
+      int8    - int8 weights and activations, calibrated on training samples;
+                ops without an int8 kernel stay in float
+    """
+    model = tf.keras.models.load_model(model_path, compile=False)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    if quantization in ("dynamic", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == "int8":
+        texts, _ = load_samples(samples_path, REPRESENTATIVE_SAMPLES)
+        inputs = encode(load_tokenizer(tokenizer_path), texts, model.inputs[0].dtype.as_numpy_dtype)
+
+        def representative_dataset():
+            for row in inputs:
+                yield [row[np.newaxis, :]]
+
+        converter.representative_dataset = representative_dataset
+
+    tflite_model = converter.convert()
+
+    with open(output_path, 'wb') as handle:
+        handle.write(tflite_model)
+
+    logger.info(f"Wrote {quantization} TFLite model to {output_path} ({len(tflite_model)} bytes)")
+
+
+def evaluate(model_path, tflite_path, tokenizer_path, eval_path, limit):
+    """Compare a converted TFLite model against the Keras model on held-out data"""
+    model = tf.keras.models.load_model(model_path, compile=False)
+    texts, labels = load_samples(eval_path, limit)
+    inputs = encode(load_tokenizer(tokenizer_path), texts, model.inputs[0].dtype.as_numpy_dtype)
+
+    keras_predictions = model.predict(inputs, batch_size=256).argmax(axis=1)
+    tflite_predictions = run_tflite(tflite_path, inputs).argmax(axis=1)
+
+    keras_accuracy = float((keras_predictions == labels).mean())
+    tflite_accuracy = float((tflite_predictions == labels).mean())
+    agreement = float((keras_predictions == tflite_predictions).mean())
+
+    logger.info(f"Evaluated {len(labels)} samples from {eval_path}")
+    logger.info(f"Keras accuracy:  {keras_accuracy:.4f}")
+    logger.info(f"TFLite accuracy: {tflite_accuracy:.4f} (delta {tflite_accuracy - keras_accuracy:+.4f})")
+    logger.info(f"Top-1 agreement: {agreement:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the thread category model for serving")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    vocab_parser = subparsers.add_parser("vocab", help="Export the tokenizer vocabulary as JSON")
+    vocab_parser.add_argument("--tokenizer", default=DEFAULT_TOKENIZER_PATH)
+    vocab_parser.add_argument("--output", default=DEFAULT_VOCAB_PATH)
+
+    saved_model_parser = subparsers.add_parser("savedmodel", help="Export the Keras model as a SavedModel")
+    saved_model_parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    saved_model_parser.add_argument("--output", default=DEFAULT_SAVED_MODEL_PATH)
+
+    onnx_parser = subparsers.add_parser("onnx", help="Export the Keras model to ONNX")
+    onnx_parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    onnx_parser.add_argument("--output", default=DEFAULT_ONNX_PATH)
+
+    tensorrt_parser = subparsers.add_parser("tensorrt", help="Convert the exported SavedModel with TF-TRT (GPU only)")
+    tensorrt_parser.add_argument("--saved-model", default=DEFAULT_SAVED_MODEL_PATH)
+    tensorrt_parser.add_argument("--output", default=DEFAULT_TRT_PATH)
+    tensorrt_parser.add_argument("--precision", choices=["fp32", "fp16", "int8"], default=os.environ.get("AI_TRT_PRECISION", "fp16"))
+    tensorrt_parser.add_argument("--tokenizer", default=DEFAULT_TOKENIZER_PATH)
+    tensorrt_parser.add_argument("--samples", default=DEFAULT_SAMPLES_PATH)
+
+    tflite_parser = subparsers.add_parser("tflite", help="Convert the Keras model to TFLite")
+    tflite_parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    tflite_parser.add_argument("--output", default=DEFAULT_TFLITE_PATH)
+    tflite_parser.add_argument("--quantization", choices=["none", "dynamic", "int8"], default="dynamic")
+    tflite_parser.add_argument("--tokenizer", default=DEFAULT_TOKENIZER_PATH)
+    tflite_parser.add_argument("--samples", default=DEFAULT_SAMPLES_PATH)
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Compare a TFLite model against the Keras model")
+    evaluate_parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    evaluate_parser.add_argument("--tflite", default=DEFAULT_TFLITE_PATH)
+    evaluate_parser.add_argument("--tokenizer", default=DEFAULT_TOKENIZER_PATH)
+    evaluate_parser.add_argument("--data", default=DEFAULT_EVAL_PATH)
+    evaluate_parser.add_argument("--limit", type=int, default=2000)
+
+    args = parser.parse_args()
+
+    if args.command == "vocab":
+        export_vocab(args.tokenizer, args.output)
+    elif args.command == "savedmodel":
+        convert_saved_model(args.model, args.output)
+    elif args.command == "onnx":
+        convert_onnx(args.model, args.output)
+    elif args.command == "tensorrt":
+        convert_tensorrt(args.saved_model, args.output, args.precision, args.tokenizer, args.samples)
+    elif args.command == "tflite":
+        convert_tflite(args.model, args.output, args.quantization, args.tokenizer, args.samples)
+    elif args.command == "evaluate":
+        evaluate(args.model, args.tflite, args.tokenizer, args.data, args.limit)
+
+
+if __name__ == "__main__":
+    main()
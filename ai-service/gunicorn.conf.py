@@ -0,0 +1,27 @@
+import gc
+import os
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+workers = int(os.environ.get("GUNICORN_WORKERS", 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+preload_app = True
+
+timeout = 60
+
+loglevel = os.environ.get("LOG_LEVEL", "WARNING" if os.environ.get("FLASK_ENV") == "production" else "INFO").lower()
+
+
+def pre_fork(server, worker):
+    """Freeze the preloaded app's objects so GC in workers does not dirty copy-on-write pages"""
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Load the model in the worker; TensorFlow, ONNX Runtime and TFLite thread pools do not survive a fork"""
+    import app
+
+    app.ensure_model_loader()
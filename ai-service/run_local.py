@@ -0,0 +1,18 @@
+import os
+import sys
+
+from dotenv import load_dotenv
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    """Start the service under gunicorn with the same configuration as the container, reading .env if present"""
+    load_dotenv(os.path.join(BASE_DIR, ".env"))
+    os.chdir(BASE_DIR)
+    os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"] + sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import orjson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AI_MODEL_PATH", os.path.join(tempfile.gettempdir(), "missing_thread_category_model.h5"))
+
+import app as service
+
+
+ADMIN_TOKEN = "test-admin-token"
+
+
+def served_model(padded):
+    """Stand-in for the previously loaded model: always predicts the third category"""
+    predictions = np.zeros((len(padded), len(service.LABELS)), dtype=np.float32)
+    predictions[:, 2] = 0.9
+    return predictions
+
+
+class FailedReloadTest(unittest.TestCase):
+    """A reload that cannot load the new artifacts must keep serving the old model"""
+
+    def setUp(self):
+        self.artifacts = tempfile.TemporaryDirectory()
+        vocab_path = os.path.join(self.artifacts.name, "vocab.json")
+        with open(vocab_path, "wb") as handle:
+            handle.write(orjson.dumps({
+                "word_index": {"<OOV>": 1, "hello": 2},
+                "num_words": None,
+                "oov_token_id": 1,
+                "filters": "!\"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n",
+                "lower": True,
+                "split": " ",
+            }))
+        model_path = os.path.join(self.artifacts.name, "thread_category_model.h5")
+        with open(model_path, "wb") as handle:
+            handle.write(b"not a model")
+
+        patches = [
+            mock.patch.object(service, "model_loader", object()),
+            mock.patch.object(service, "models_ready", threading.Event()),
+            mock.patch.object(service, "models_ok", True),
+            mock.patch.object(service, "predict_fn", served_model),
+            mock.patch.object(service, "encode_text", lambda content: [1, 2, 3]),
+            mock.patch.object(service, "using_fresh_model", False),
+            mock.patch.object(service, "dynamic_padding", False),
+            mock.patch.object(service, "allow_fresh", False),
+            mock.patch.object(service, "MODEL_CANDIDATES", [("keras", model_path)]),
+            mock.patch.object(service, "TOKENIZER_CANDIDATES", [("vocab", vocab_path)]),
+            mock.patch.dict(os.environ, {"AI_ADMIN_TOKEN": ADMIN_TOKEN}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        service.models_ready.set()
+        self.addCleanup(self.artifacts.cleanup)
+
+        with service.prediction_cache_lock:
+            service.prediction_cache.clear()
+        self.client = service.app.test_client()
+
+    def test_failed_reload_keeps_serving_previous_model(self):
+        response = self.client.post("/reload", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"})
+        self.assertEqual(response.status_code, 503)
+        self.assertTrue(service.models_ok)
+        self.assertIs(service.predict_fn, served_model)
+
+        response = self.client.post("/predict/category", json={"content": "hello there", "all_categories": True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["category"], service.LABELS[2])
+
+
+if __name__ == "__main__":
+    unittest.main()